@@ -13,4 +13,7 @@ POSTGRES_HOST = os.environ.get("POSTGRES_HOST") or "localhost"
 POSTGRES_PORT = try_parse(int, os.environ.get("POSTGRES_PORT")) or 5432
 POSTGRES_USER = os.environ.get("POSTGRES_USER") or "user"
 POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASS") or "pass"
-POSTGRES_DB = os.environ.get("POSTGRES_DB") or "test_db"
\ No newline at end of file
+POSTGRES_DB = os.environ.get("POSTGRES_DB") or "test_db"
+
+# Create the schema on startup (dev convenience, off in production)
+AUTO_MIGRATE = (os.environ.get("AUTO_MIGRATE") or "").lower() in ("1", "true", "yes")
\ No newline at end of file
@@ -1,7 +1,9 @@
 import asyncio
-import json
 from typing import Set, Dict, List, Any, Union
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Body
+import asyncpg
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, Body
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy import (
     create_engine,
     MetaData,
@@ -10,25 +12,26 @@ from sqlalchemy import (
     Integer,
     String,
     Float,
-    DateTime, update,
+    DateTime, update, Index,
 )
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import select
-from datetime import datetime
-from pydantic import BaseModel, field_validator, Field, parse_obj_as, ConfigDict
+from datetime import datetime, timezone
+from pydantic import BaseModel, field_validator, Field, TypeAdapter, ConfigDict, ValidationError
 from config import (
     POSTGRES_HOST,
     POSTGRES_PORT,
     POSTGRES_DB,
     POSTGRES_USER,
     POSTGRES_PASSWORD,
+    AUTO_MIGRATE,
 )
 
 # FastAPI app setup
-app = FastAPI()
-# SQLAlchemy setup
+app = FastAPI(default_response_class=ORJSONResponse)
+# SQLAlchemy setup (kept for schema creation only, queries go through asyncpg)
 DATABASE_URL = f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-engine = create_engine(DATABASE_URL)
+ASYNCPG_DSN = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 metadata = MetaData()
 
 
@@ -38,6 +41,9 @@ Base = declarative_base()
 # Define SQLAlchemy ORM mapped class
 class ProcessedAgentDataDbModel(Base):
     __tablename__ = 'processed_agent_data'
+    __table_args__ = (
+        Index("ix_processed_agent_data_user_id_timestamp", "user_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     road_state = Column(String)
@@ -50,8 +56,42 @@ class ProcessedAgentDataDbModel(Base):
     timestamp = Column(DateTime)
 
 
-Base.metadata.create_all(engine)
-SessionLocal = sessionmaker(bind=engine)
+# asyncpg connection pool, created on application startup
+pool: asyncpg.Pool = None
+
+
+@app.on_event("startup")
+async def create_schema():
+    # Dev convenience only; production schemas come from docker/db/structure.sql
+    if AUTO_MIGRATE:
+        engine = create_engine(DATABASE_URL)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+
+async def init_connection(conn: asyncpg.Connection):
+    # Runs once per new pool connection; the dummy fetch pre-populates the
+    # prepared-statement cache for the hottest lookup
+    await conn.execute("SET timezone TO 'UTC'")
+    await conn.fetchrow("SELECT * FROM processed_agent_data WHERE id = $1", 0)
+
+
+@app.on_event("startup")
+async def create_pool():
+    global pool
+    pool = await asyncpg.create_pool(
+        ASYNCPG_DSN,
+        min_size=5,
+        max_size=20,
+        max_queries=50000,
+        max_inactive_connection_lifetime=300,
+        init=init_connection,
+    )
+
+
+@app.on_event("shutdown")
+async def close_pool():
+    await pool.close()
 
 
 # SQLAlchemy model
@@ -105,6 +145,22 @@ class ProcessedAgentData(BaseModel):
     agent_data: AgentData
 
 
+# Compiled once at import; validates the whole POST body in native code
+BATCH_ADAPTER = TypeAdapter(List[ProcessedAgentData])
+
+PROCESSED_AGENT_DATA_COLUMNS = (
+    "road_state",
+    "user_id",
+    "x",
+    "y",
+    "z",
+    "latitude",
+    "longitude",
+    "timestamp",
+)
+# Below this batch size a single prepared INSERT is cheaper than COPY
+COPY_THRESHOLD = 500
+
 # WebSocket subscriptions
 subscriptions: Dict[int, Set[WebSocket]] = {}
 
@@ -126,63 +182,143 @@ async def websocket_endpoint(websocket: WebSocket, user_id: int):
 # Function to send data to subscribed users
 async def send_data_to_subscribers(user_id: int, data):
     if user_id in subscriptions:
-        for websocket in subscriptions[user_id]:
-            await websocket.send_json(json.dumps(data))
-
-
-def convert_agent_data(raw_data: ProcessedAgentData):
-    return ProcessedAgentDataDbModel(
-        road_state=raw_data.road_state,
-        user_id=raw_data.agent_data.user_id,
-        x=raw_data.agent_data.accelerometer.x,
-        y=raw_data.agent_data.accelerometer.y,
-        z=raw_data.agent_data.accelerometer.z,
-        latitude=raw_data.agent_data.gps.latitude,
-        longitude=raw_data.agent_data.gps.longitude,
-        timestamp=raw_data.agent_data.timestamp,
+        payload = orjson.dumps(data)
+        await asyncio.gather(
+            *(websocket.send_bytes(payload) for websocket in subscriptions[user_id]),
+            return_exceptions=True,
+        )
+
+
+def naive_utc(ts: datetime) -> datetime:
+    # The timestamp column is a naive TIMESTAMP; asyncpg rejects aware
+    # datetimes on it, so offsets (e.g. a trailing Z) are folded into UTC
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def to_row(raw_data: ProcessedAgentData):
+    agent_data = raw_data.agent_data
+    return (
+        raw_data.road_state,
+        agent_data.user_id,
+        agent_data.accelerometer.x,
+        agent_data.accelerometer.y,
+        agent_data.accelerometer.z,
+        agent_data.gps.latitude,
+        agent_data.gps.longitude,
+        naive_utc(agent_data.timestamp),
     )
 
 
+def record_to_dict(record: asyncpg.Record) -> Dict[str, Any]:
+    row = dict(record)
+    row["timestamp"] = row["timestamp"].isoformat()
+    return row
+
+
 # FastAPI CRUDL endpoints
 
 
 @app.post("/processed_agent_data/",)
-async def create_processed_agent_data(data: List[ProcessedAgentData]):
+async def create_processed_agent_data(request: Request):
     # Insert data to database
     # Send data to subscribers
-    with SessionLocal() as session:
-        converted_data = []
-
-        for dataItem in data:
-            converted_data.append(convert_agent_data(dataItem))
-
-        session.add_all(converted_data)
-        session.commit()
-
-        for processed_subscriber in subscriptions:
-            await send_data_to_subscribers(processed_subscriber, converted_data)
+    try:
+        data = BATCH_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        # include_input=False keeps raw body bytes out of the detail,
+        # which the default exception handler cannot JSON-serialize
+        raise HTTPException(status_code=422, detail=e.errors(include_input=False))
+    rows = [to_row(dataItem) for dataItem in data]
+
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            if len(rows) < COPY_THRESHOLD:
+                await conn.executemany(
+                    "INSERT INTO processed_agent_data"
+                    " (road_state, user_id, x, y, z, latitude, longitude, timestamp)"
+                    " VALUES ($1, $2, $3, $4, $5, $6, $7, $8)",
+                    rows,
+                )
+            else:
+                await conn.copy_records_to_table(
+                    "processed_agent_data",
+                    records=rows,
+                    columns=PROCESSED_AGENT_DATA_COLUMNS,
+                )
+
+    inserted_data = []
+    for row in rows:
+        item = dict(zip(PROCESSED_AGENT_DATA_COLUMNS, row))
+        item["timestamp"] = item["timestamp"].isoformat()
+        inserted_data.append(item)
+
+    # Serialize once and fan out in parallel, but only to sockets
+    # subscribed to a user_id present in this batch
+    payload = orjson.dumps(inserted_data)
+    affected_users = {
+        dataItem.agent_data.user_id for dataItem in data
+    } & subscriptions.keys()
+    targets = {
+        websocket
+        for user_id in affected_users
+        for websocket in subscriptions[user_id]
+    }
+    await asyncio.gather(
+        *(websocket.send_bytes(payload) for websocket in targets),
+        return_exceptions=True,
+    )
 
 @app.get(
     "/processed_agent_data/{processed_agent_data_id}",
     response_model=Union[ProcessedAgentDataInDB, None],
 )
-def read_processed_agent_data(processed_agent_data_id: int):
+async def read_processed_agent_data(processed_agent_data_id: int):
     # Get data by id
-    with SessionLocal() as session:
-        found_record = session.query(ProcessedAgentDataDbModel).get(processed_agent_data_id)
-
-        if found_record is None:
-            return None
-
-        return ProcessedAgentDataInDB.model_validate(found_record)
+    async with pool.acquire() as conn:
+        found_record = await conn.fetchrow(
+            "SELECT * FROM processed_agent_data WHERE id = $1",
+            processed_agent_data_id,
+        )
+
+    if found_record is None:
+        return None
+
+    return ProcessedAgentDataInDB.model_validate(dict(found_record))
+
+
+@app.get("/processed_agent_data/")
+async def list_processed_agent_data(
+    user_id: Union[int, None] = None,
+    since: Union[datetime, None] = None,
+    limit: int = Query(100, ge=0, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    # Filters hit the (user_id, timestamp) composite index
+    conditions = []
+    params = []
+    if user_id is not None:
+        params.append(user_id)
+        conditions.append(f"user_id = ${len(params)}")
+    if since is not None:
+        params.append(naive_utc(since))
+        conditions.append(f"timestamp >= ${len(params)}")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (
+        f"SELECT * FROM processed_agent_data{where}"
+        f" ORDER BY timestamp LIMIT ${len(params) + 1} OFFSET ${len(params) + 2}"
+    )
+    params += [limit, offset]
 
+    # Stream rows as NDJSON straight from a server-side cursor
+    async def stream_rows():
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                async for record in conn.cursor(query, *params):
+                    yield orjson.dumps(dict(record)) + b"\n"
 
-@app.get("/processed_agent_data/", response_model=List[ProcessedAgentDataInDB])
-def list_processed_agent_data():
-    # Get list of data
-    with SessionLocal() as session:
-        return session.query(ProcessedAgentDataDbModel).all()
-    return null
+    return StreamingResponse(stream_rows(), media_type="application/x-ndjson")
 
 @app.put(
     "/processed_agent_data/{processed_agent_data_id}",
@@ -192,45 +328,47 @@ async def update_processed_agent_data(processed_agent_data_id: int, data: Proces
     # Update data
     # Insert data to database
     # Send data to subscribers
-    with SessionLocal() as session:
-        updated_entry = session.query(ProcessedAgentDataDbModel).get(processed_agent_data_id)
-        if updated_entry is None:
-            return None
-
-        updated_converted_data = convert_agent_data(data)
-
-        updated_entry.road_state = updated_converted_data.road_state,
-        updated_entry.user_id = updated_converted_data.user_id,
-        updated_entry.x = updated_converted_data.x,
-        updated_entry.y = updated_converted_data.y,
-        updated_entry.z = updated_converted_data.z,
-        updated_entry.latitude = updated_converted_data.latitude,
-        updated_entry.longitude = updated_converted_data.longitude,
-        updated_entry.timestamp = updated_converted_data.timestamp,
-
-        session.commit()
-
-        for subscriber_id in subscriptions:
-            await send_data_to_subscribers(subscriber_id, updated_entry)
-
-        return ProcessedAgentDataInDB.model_validate(updated_entry)
+    async with pool.acquire() as conn:
+        updated_entry = await conn.fetchrow(
+            "UPDATE processed_agent_data SET"
+            " road_state = $1, user_id = $2, x = $3, y = $4, z = $5,"
+            " latitude = $6, longitude = $7, timestamp = $8"
+            " WHERE id = $9 RETURNING *",
+            data.road_state,
+            data.agent_data.user_id,
+            data.agent_data.accelerometer.x,
+            data.agent_data.accelerometer.y,
+            data.agent_data.accelerometer.z,
+            data.agent_data.gps.latitude,
+            data.agent_data.gps.longitude,
+            naive_utc(data.agent_data.timestamp),
+            processed_agent_data_id,
+        )
+
+    if updated_entry is None:
+        return None
+
+    await send_data_to_subscribers(updated_entry["user_id"], record_to_dict(updated_entry))
+
+    return ProcessedAgentDataInDB.model_validate(dict(updated_entry))
 
 
 @app.delete(
     "/processed_agent_data/{processed_agent_data_id}",
     response_model=ProcessedAgentDataInDB,
 )
-def delete_processed_agent_data(processed_agent_data_id: int):
+async def delete_processed_agent_data(processed_agent_data_id: int):
     # Delete by id
-    with SessionLocal() as session:
-        deleted_entry = session.query(ProcessedAgentDataDbModel).get(processed_agent_data_id)
-        if deleted_entry is None:
-            return None
+    async with pool.acquire() as conn:
+        deleted_entry = await conn.fetchrow(
+            "DELETE FROM processed_agent_data WHERE id = $1 RETURNING *",
+            processed_agent_data_id,
+        )
 
-        session.query(ProcessedAgentDataDbModel).filter(ProcessedAgentDataDbModel.id == processed_agent_data_id).delete()
-        session.commit()
+    if deleted_entry is None:
+        return None
 
-        return ProcessedAgentDataInDB.model_validate(deleted_entry)
+    return ProcessedAgentDataInDB.model_validate(dict(deleted_entry))
 
 
 if __name__ == "__main__":
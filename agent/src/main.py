@@ -26,10 +26,11 @@ def connect_mqtt(broker, port):
 
 def publish(client, topic, datasource, delay):
     datasource.startReading()
+    schema = AggregatedDataSchema()
     while True:
         time.sleep(delay)
         data = datasource.read()
-        msg = AggregatedDataSchema().dumps(data)
+        msg = schema.dumps(data)
         result = client.publish(topic, msg)
         #result: [0, 1]
         status = result[0]
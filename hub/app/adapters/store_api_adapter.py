@@ -21,4 +21,17 @@ class StoreApiAdapter(StoreGateway):
         Returns:
             bool: True if the data is successfully saved, False otherwise.
         """
-        # Implement it
+        url = f"{self.api_base_url}/processed_agent_data/"
+
+        # One POST per batch: the Store endpoint accepts the whole list
+        response = requests.post(
+            url,
+            data=pydantic_core.to_json(processed_agent_data_batch),
+            headers={"Content-Type": "application/json"},
+        )
+        if response.status_code != 200:
+            logging.info(
+                f"Invalid Store response\nData: {processed_agent_data_batch}\nResponse: {response}"
+            )
+            return False
+        return True
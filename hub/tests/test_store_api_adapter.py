@@ -1,3 +1,4 @@
+import pydantic_core
 import requests
 import unittest
 from unittest.mock import Mock, patch
@@ -28,13 +29,15 @@ class TestStoreApiAdapter(unittest.TestCase):
         )
         processed_data = ProcessedAgentData(road_state="normal", agent_data=agent_data)
         # Mock the response from the Store API
-        mock_response = Mock(status_code=201)  # 201 indicates successful creation
+        mock_response = Mock(status_code=200)  # only 200 counts as success
         mock_post.return_value = mock_response
         # Call the save_data method
-        result = self.store_api_adapter.save_data(processed_data)
+        result = self.store_api_adapter.save_data([processed_data])
         # Ensure that the post method of the mock is called with the correct arguments
         mock_post.assert_called_once_with(
-            "http://test-api.com/agent_data", json=processed_data.model_dump()
+            "http://test-api.com/processed_agent_data/",
+            data=pydantic_core.to_json([processed_data]),
+            headers={"Content-Type": "application/json"},
         )
         # Ensure that the result is True, indicating successful saving
         self.assertTrue(result)
@@ -60,10 +63,12 @@ class TestStoreApiAdapter(unittest.TestCase):
         mock_response = Mock(status_code=400)  # 400 indicates a client error
         mock_post.return_value = mock_response
         # Call the save_data method
-        result = self.store_api_adapter.save_data(processed_data)
+        result = self.store_api_adapter.save_data([processed_data])
         # Ensure that the post method of the mock is called with the correct arguments
         mock_post.assert_called_once_with(
-            "http://test-api.com/agent_data", json=processed_data.model_dump()
+            "http://test-api.com/processed_agent_data/",
+            data=pydantic_core.to_json([processed_data]),
+            headers={"Content-Type": "application/json"},
         )
         # Ensure that the result is False, indicating failure to save
         self.assertFalse(result)